@@ -1,10 +1,25 @@
+import ast
+import builtins
+import functools
+import inspect
+import linecache
+import math
+import os
+import sqlite3
+import stat
+
 import numpy as np
 from flask import Flask
 import dash
 from dash import dcc, html, dash_table
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 import plotly.graph_objects as go
-from sympy import sympify, lambdify
+from sympy import sympify, lambdify, __version__ as sympy_version
+
+try:
+    import diskcache
+except ImportError:  # diskcache is optional; without it each worker only has its in-process cache
+    diskcache = None
 
 # Flask App Setup
 server = Flask(__name__)
@@ -12,26 +27,272 @@ server = Flask(__name__)
 # Dash App Setup
 app = dash.Dash(__name__, server=server, url_base_pathname='/bisection/')
 
+x = sympify("x")
+_COMPILE_CACHE_SIZE = 128
+
+# Generated source of lambdified equations, shared by all worker processes of this user
+_SHARED_CACHE_DIR = os.environ.get("BISECTION_EQCACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "bisection-eqcache"
+)
+
+
+# Cached source is executed on a hit, so the cache is only used from a directory that this user owns and
+# nobody else can write to; otherwise (or if it can't be opened) it is disabled
+def _open_shared_cache(path):
+    if diskcache is None or not hasattr(os, "getuid"):
+        return None
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.stat(path)
+        if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return None
+        return diskcache.Cache(path, eviction_policy="least-recently-used")
+    except (OSError, sqlite3.Error):
+        return None
+
+
+_SHARED_CACHE = _open_shared_cache(_SHARED_CACHE_DIR)
+# Bumped whenever the layout of cached entries changes; entries are also keyed by the SymPy version
+# that generated them
+_SHARED_CACHE_FORMAT = 2
+
+
+# Names a plain Python equation may use
+_FUNCTIONS = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh, "exp": math.exp, "log": math.log,
+    "sqrt": math.sqrt, "abs": abs,
+}
+_CONSTANTS = {"pi": math.pi, "E": math.e}
+_MATH_NS = {"__builtins__": {}, **_CONSTANTS, **_FUNCTIONS}
+
+
+# Accepts only numeric literals, x, the constants above and one-argument calls to the functions above,
+# combined with + - * / **. Anything else is left to SymPy.
+class _SafeExpression(ast.NodeVisitor):
+    _NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Call, ast.Load,
+              ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.UAdd, ast.USub)
+
+    def __init__(self):
+        self.uses_x = False
+
+    def generic_visit(self, node):
+        if not isinstance(node, self._NODES):
+            raise ValueError(f"unsupported syntax: {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float):
+            raise ValueError(f"unsupported literal: {node.value!r}")
+        # Literals become floats so constants fold in the same float arithmetic the solver runs in,
+        # rather than into arbitrarily large ints (e.g. 2**70)
+        node.value = float(node.value)
+
+    def visit_Name(self, node):
+        if node.id == "x":
+            self.uses_x = True
+        elif node.id not in _CONSTANTS:
+            raise ValueError(f"unknown name: {node.id}")
+
+    def visit_Call(self, node):
+        if not (isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS
+                and len(node.args) == 1 and not node.keywords):
+            raise ValueError("unsupported call")
+        self.visit(node.args[0])
+
+
+# Compile a whitelisted equation straight to a `lambda x: ...` code object, bypassing SymPy.
+# Returns (code, uses_x), or None if the equation needs SymPy.
+def _safe_compile(equation):
+    try:
+        tree = ast.parse(equation, mode="eval")
+        checker = _SafeExpression()
+        checker.visit(tree)
+    except (SyntaxError, ValueError, OverflowError):
+        return None
+
+    args = ast.arguments(posonlyargs=[], args=[ast.arg(arg="x")], kwonlyargs=[], kw_defaults=[], defaults=[])
+    func = ast.Expression(body=ast.Lambda(args=args, body=tree.body))
+    return compile(ast.fix_missing_locations(func), "<equation>", "eval"), checker.uses_x
+
+
+# Plain numbers need no generated code
+def _constant(value):
+    return lambda _x: value
+
+
+# Namespace that lambdify's backend ("math", or None for its default modules) runs its generated code in
+@functools.lru_cache(maxsize=None)
+def _lambdify_namespace(modules):
+    return lambdify(x, x, modules=modules).__globals__
+
+
+# True if a lambdified function refers to names its backend does not provide, i.e. calling it
+# would raise NameError
+def _has_unresolved_names(func):
+    return any(name not in func.__globals__ and not hasattr(builtins, name) for name in func.__code__.co_names)
+
+
+# Rebuild a lambdified function from source stored in the shared cache, without going through SymPy
+def _from_source(modules, name, source):
+    namespace = dict(_lambdify_namespace(modules))
+    exec(compile(source, "<eqcache>", "exec"), namespace)
+    return namespace[name]
+
+
+def _shared_key(equation):
+    return _SHARED_CACHE_FORMAT, sympy_version, equation
+
+
+# Rebuild an equation from the shared cache; unreadable or stale entries count as a miss, so the
+# equation is compiled normally and its entry overwritten
+def _shared_get(equation):
+    if _SHARED_CACHE is None:
+        return None
+    try:
+        shared = _SHARED_CACHE.get(_shared_key(equation))
+        return _from_source(*shared) if shared is not None else None
+    except Exception:
+        return None
 
-# Function to perform the Bisection Method
-def bisection_method(func, a, b, tol=1e-6, max_iter=100):
-    if func(a) * func(b) >= 0:
-        return None, None, "Function must have opposite signs at the endpoints a and b."
 
-    iterations = []
+# Store a lambdified equation's source in the shared cache. The cache is only an optimisation, so
+# failures (e.g. the source already dropped from linecache by another thread) are ignored.
+def _shared_set(equation, modules, func):
+    if _SHARED_CACHE is None:
+        return
+    try:
+        _SHARED_CACHE.set(_shared_key(equation), (modules, func.__name__, inspect.getsource(func)))
+    except Exception:
+        pass
+
+
+# Compile an equation to a scalar function once; repeated solves of the same equation reuse it.
+# Equations that need SymPy are also looked up in the shared cache, so other workers skip sympify.
+@functools.lru_cache(maxsize=_COMPILE_CACHE_SIZE)
+def _compile_cached(equation):
+    compiled = _safe_compile(equation)
+    if compiled is not None:
+        code, uses_x = compiled
+        if not uses_x:
+            return _constant(float(eval(code, dict(_MATH_NS))(0.0)))
+        return eval(code, dict(_MATH_NS))
+
+    shared = _shared_get(equation)
+    if shared is not None:
+        return shared
+
+    expr = sympify(equation)
+    try:
+        value = float(expr)
+    except TypeError:
+        pass
+    else:
+        return _constant(value)
+
+    # Every lambdify registers its source in linecache; drop it once the cache starts evicting
+    if _compile_cached.cache_info().currsize >= _COMPILE_CACHE_SIZE:
+        linecache.clearcache()
+    # The "math" backend works on plain floats, which is all the bisection loop needs; cse factors out
+    # repeated subterms
+    modules = "math"
+    func = lambdify(x, expr, modules=modules, cse=True)
+    if _has_unresolved_names(func):
+        # Some functions (e.g. re, im, or SciPy's besselj) have no math implementation; use lambdify's
+        # default modules, which include NumPy and SciPy when installed
+        modules = None
+        func = lambdify(x, expr, modules=modules, cse=True)
+    _shared_set(equation, modules, func)
+    return func
+
+
+def _compile(equation):
+    return _compile_cached(equation.strip())
+
+
+_CONVERGED, _BAD_BRACKET, _MAX_ITER, _NOT_FINITE = 0, 1, 2, 3
+# Column order of the iteration rows, matching the ids of the iteration table
+_KEYS = ("Iteration", "a", "b", "c", "f(a)", "f(b)", "f(c)")
+# Rows per table page; the table is paginated server-side so only one page is sent to the browser
+_PAGE_SIZE = 20
+# Upper bound on iterations: halving a finite bracket reaches adjacent floats (and the nextafter stop)
+# within about 2100 steps, however wide it starts
+_MAX_ROWS = 2200
+_ERRORS = {
+    _BAD_BRACKET: "Function must have opposite signs at the endpoints a and b.",
+    _MAX_ITER: "Maximum iterations reached without convergence.",
+    _NOT_FINITE: "Function must be finite at the endpoints a and b.",
+}
+
+
+# Evaluate f at a bracket endpoint; results that aren't real numbers (math domain errors, complex
+# values) come back as nan so they are reported as a non-finite endpoint
+def _endpoint_value(func, v):
+    try:
+        return float(func(v))
+    except (ArithmeticError, ValueError, TypeError):
+        return math.nan
+
+
+# Bisection loop; fills one (iteration, a, b, c, f(a), f(b), f(c)) row per step and returns
+# (rows, count, status)
+def _bisect(func, a, b, tol, max_iter):
+    max_iter = min(max(max_iter, 0), _MAX_ROWS)
+    buf = np.empty((max_iter, 7))
+    fa = _endpoint_value(func, a)
+    fb = _endpoint_value(func, b)
+    # A nan would compare as positive below and make the bracket check depend on the other endpoint
+    if not (math.isfinite(fa) and math.isfinite(fb)):
+        return buf, 0, _NOT_FINITE
+    # Compare signs instead of multiplying, which can overflow to inf or underflow to zero
+    sa = fa < 0.0
+    if fa == 0.0 or fb == 0.0 or sa == (fb < 0.0):
+        return buf, 0, _BAD_BRACKET
+
     for i in range(max_iter):
         c = (a + b) / 2
         f_c = func(c)
-        iterations.append({"Iteration": i + 1, "a": a, "b": b, "c": c, "f(c)": f_c})
+        buf[i, 0] = i + 1
+        buf[i, 1] = a
+        buf[i, 2] = b
+        buf[i, 3] = c
+        buf[i, 4] = fa
+        buf[i, 5] = fb
+        buf[i, 6] = f_c
 
-        if abs(f_c) < tol or (b - a) / 2 < tol:
-            return c, iterations, None  # Root found
-        if f_c * func(a) < 0:
-            b = c
+        # Also stop once no float lies between a and b; further halving cannot move c
+        if f_c == 0.0 or abs(f_c) < tol or (b - a) / 2 < tol or math.nextafter(a, b) >= b:
+            return buf, i + 1, _CONVERGED  # Root found
+        # f(a) and f(b) only change when their endpoint moves, so they are carried along instead of re-evaluated
+        sc = f_c < 0.0
+        if sa != sc:
+            b, fb = c, f_c
         else:
-            a = c
+            a, fa, sa = c, f_c, sc
 
-    return None, iterations, "Maximum iterations reached without convergence."
+    return buf, max_iter, _MAX_ITER
+
+
+# Function to perform the Bisection Method; iterations are returned as an (n, 7) array of
+# (iteration, a, b, c, f(a), f(b), f(c)) rows
+def bisection_method(func, a, b, tol=1e-6, max_iter=100):
+    buf, n, status = _bisect(func, a, b, tol, max_iter)
+    if status in (_BAD_BRACKET, _NOT_FINITE):
+        return None, None, _ERRORS[status]
+
+    # Copied so the memoized result doesn't keep the whole buffer alive
+    iterations = buf[:n].copy()
+    # Read-only, since memoized results are shared between callback invocations
+    iterations.flags.writeable = False
+    if status == _MAX_ITER:
+        return None, iterations, _ERRORS[status]
+    return iterations[-1, 3], iterations, None
+
+
+# Memoized solve; Dash re-runs the callback with the same inputs, so repeats are answered from the cache
+@functools.lru_cache(maxsize=256)
+def _solve(equation, a, b, tol, max_iter):
+    return bisection_method(_compile(equation), a, b, tol, max_iter)
 
 
 # Dash Layout
@@ -167,8 +428,14 @@ app.layout = html.Div(
                         {"name": "a", "id": "a"},
                         {"name": "b", "id": "b"},
                         {"name": "c (Midpoint)", "id": "c"},
+                        {"name": "f(a)", "id": "f(a)"},
+                        {"name": "f(b)", "id": "f(b)"},
                         {"name": "f(c)", "id": "f(c)"},
                     ],
+                    page_action="custom",
+                    page_current=0,
+                    page_size=_PAGE_SIZE,
+                    page_count=1,
                     style_table={"overflowX": "auto"},
                     style_cell={
                         "textAlign": "center",
@@ -182,69 +449,90 @@ app.layout = html.Div(
                 )
             ]
         ),
+
+        # Inputs of the last successful solve, so the table pages through that solve and not the live form values
+        dcc.Store(id="solved_inputs"),
     ]
 )
 
 
 # The rest of the code for callbacks remains the same.
 
+# Shared by every error return; Dash only serializes it, so one instance is enough
+_EMPTY_FIG = go.Figure()
+
+_GRAPH_LAYOUT = go.Layout(
+    title="Bisection Method Iterations",
+    xaxis_title="x",
+    yaxis_title="f(x)",
+    legend_title="Bounds",
+    template="plotly_white"
+)
+
 
 # Dash Callback
 @app.callback(
     [Output("output_message", "children"),
      Output("bisection_graph", "figure"),
-     Output("iteration_table", "data")],
+     Output("iteration_table", "page_current"),
+     Output("solved_inputs", "data")],
     [Input("solve_button", "n_clicks")],
-    [Input("equation", "value"),
-     Input("lower_bound", "value"),
-     Input("upper_bound", "value"),
-     Input("tolerance", "value"),
-     Input("max_iter", "value")]
+    [State("equation", "value"),
+     State("lower_bound", "value"),
+     State("upper_bound", "value"),
+     State("tolerance", "value"),
+     State("max_iter", "value")]
 )
 def update_output(n_clicks, equation, lower_bound, upper_bound, tolerance, max_iter):
     if not (equation and lower_bound and upper_bound):
-        return "Please provide all inputs.", go.Figure(), []
+        return "Please provide all inputs.", _EMPTY_FIG, 0, None
 
     try:
-        # Convert equation to a callable function
-        x = sympify("x")
-        func = lambdify(x, sympify(equation))
-
         # Apply the Bisection Method
-        root, iterations, error = bisection_method(func, float(lower_bound), float(upper_bound), float(tolerance),
-                                                   int(max_iter))
+        inputs = (equation.strip(), float(lower_bound), float(upper_bound), float(tolerance), int(max_iter))
+        root, rows, error = _solve(*inputs)
 
         if error:
-            return error, go.Figure(), []
-
-        # Prepare data for the graph
-        a_vals = [row["a"] for row in iterations]
-        b_vals = [row["b"] for row in iterations]
-        c_vals = [row["c"] for row in iterations]
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=a_vals, y=[func(a) for a in a_vals], mode="markers+lines", name="Lower Bound (a)"))
-        fig.add_trace(go.Scatter(x=b_vals, y=[func(b) for b in b_vals], mode="markers+lines", name="Upper Bound (b)"))
-        fig.add_trace(go.Scatter(x=c_vals, y=[func(c) for c in c_vals], mode="markers", name="Midpoint (c)",
-                                 marker=dict(size=10, color="red")))
-
-        fig.update_layout(
-            title="Bisection Method Iterations",
-            xaxis_title="x",
-            yaxis_title="f(x)",
-            legend_title="Bounds",
-            template="plotly_white"
-        )
+            return error, _EMPTY_FIG, 0, None
+
+        # Prepare data for the graph; the function values were already recorded by the solver
+        a_vals, b_vals, c_vals = rows[:, 1], rows[:, 2], rows[:, 3]
+        fa_vals, fb_vals, fc_vals = rows[:, 4], rows[:, 5], rows[:, 6]
+        fig = go.Figure(layout=_GRAPH_LAYOUT)
+        fig.add_trace(go.Scattergl(x=a_vals, y=fa_vals, mode="markers+lines", name="Lower Bound (a)"))
+        fig.add_trace(go.Scattergl(x=b_vals, y=fb_vals, mode="markers+lines", name="Upper Bound (b)"))
+        fig.add_trace(go.Scattergl(x=c_vals, y=fc_vals, mode="markers", name="Midpoint (c)",
+                                   marker=dict(size=10, color="red")))
 
         # Add a marker for the root
-        fig.add_trace(go.Scatter(
-            x=[root], y=[func(root)], mode="markers+text", name="Root",
+        fig.add_trace(go.Scattergl(
+            x=[root], y=[rows[-1, 6]], mode="markers+text", name="Root",
             text=[f"Root: {root:.4f}"], textposition="top center", marker=dict(color="green", size=12)
         ))
 
-        return f"Root: {root:.6f} (found in {len(iterations)} iterations)", fig, iterations
+        # A new solve starts the table back at its first page
+        return f"Root: {root:.6f} (found in {len(rows)} iterations)", fig, 0, inputs
 
     except Exception as e:
-        return f"Error: {e}", go.Figure(), []
+        return f"Error: {e}", _EMPTY_FIG, 0, None
+
+
+# Table pagination callback; pages are sliced from the memoized solve, so paging doesn't recompute anything
+@app.callback(
+    [Output("iteration_table", "data"),
+     Output("iteration_table", "page_count")],
+    [Input("solved_inputs", "data"),
+     Input("iteration_table", "page_current")]
+)
+def update_table(solved_inputs, page_current):
+    if not solved_inputs:
+        return [], 1
+
+    _, rows, _ = _solve(*solved_inputs)
+
+    start = (page_current or 0) * _PAGE_SIZE
+    page = rows[start:start + _PAGE_SIZE]
+    return [dict(zip(_KEYS, row)) for row in page.tolist()], max(1, -(-len(rows) // _PAGE_SIZE))
 
 
 if __name__ == "__main__":